@@ -10,11 +10,39 @@ Requirements:
 - API credentials configured
 """
 
+import io
 import os
 import sys
+import json
+import shutil
 import asyncio
+import hashlib
+import concurrent.futures
 from pathlib import Path
 
+from PIL import Image
+
+# pybase64 (SIMD-accelerated) is a drop-in replacement for stdlib base64
+try:
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+
+# blake3 (SIMD-accelerated) hashes several times faster than blake2b
+try:
+    from blake3 import blake3 as _content_hash
+except ImportError:
+    def _content_hash(data):
+        return hashlib.blake2b(data, digest_size=16)
+
+# uvloop's libuv-based event loop cuts callback overhead for the many
+# concurrent polls and chunked downloads (Linux/macOS only)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 # Add ComfyUI to path
 comfy_path = Path(__file__).parent
 sys.path.insert(0, str(comfy_path))
@@ -36,96 +64,295 @@ FACE_COUNT = 500000
 GENERATE_TYPE = "Normal"
 POLYGON_TYPE = "triangle"
 MAX_WAIT_TIME = 600
+MAX_CONCURRENT = 5  # Parallel jobs submitted to the API at once
+LEDGER_FILE = "batch_ledger.jsonl"  # Crash-resume checkpoint
 
 # Supported image formats
 IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.bmp'}
 
+# Formats the API accepts as-is; anything else is re-encoded to PNG first
+API_NATIVE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp'}
+
+# Long-edge cap for uploads - the API downsamples internally, so sending
+# an 8K original only wastes upload bandwidth and base64 CPU
+MAX_UPLOAD_EDGE = 2048
+
 
 def get_image_files(folder_path):
     """Get all image files from folder"""
-    folder = Path(folder_path)
-    if not folder.exists():
+    if not os.path.isdir(folder_path):
         print(f"❌ Folder not found: {folder_path}")
         return []
-    
+
+    # os.scandir reuses the directory entry's cached type info, avoiding a
+    # stat() and a Path object per entry on large folders
     images = []
-    for file in folder.iterdir():
-        if file.suffix.lower() in IMAGE_EXTENSIONS:
-            images.append(file)
-    
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            name = entry.name
+            dot = name.rfind('.')
+            if dot >= 0 and name[dot:].lower() in IMAGE_EXTENSIONS:
+                images.append(Path(entry.path))
+
     return sorted(images)
 
 
-async def process_image(client, file_manager, image_path):
+def _encode_png_b64(image_path):
+    """Re-encode an image to PNG and base64 it (CPU-bound, run in a worker)"""
+    with Image.open(image_path) as image:
+        # Pre-size the buffer (~half the raw RGB size is plenty for PNG)
+        # to avoid BytesIO doubling reallocations; level-1 deflate is
+        # much cheaper than the default and the bytes are transient
+        estimated_size = image.width * image.height * 3 // 2
+        with io.BytesIO(bytes(estimated_size)) as buffer:
+            buffer.seek(0)
+            image.save(buffer, format="PNG", compress_level=1)
+            buffer.truncate()
+            image_bytes = buffer.getvalue()
+
+    # Decoded image and encode buffer are released above, so only the raw
+    # bytes and their base64 form coexist during the encode below
+    encoded = _b64.b64encode(image_bytes).decode('ascii')
+    del image_bytes
+    return encoded
+
+
+def _read_file_b64(image_path):
+    """Base64-encode upload bytes, downscaling oversized inputs first
+
+    Images within MAX_UPLOAD_EDGE are sent as raw file bytes; larger ones
+    are thumbnailed and re-encoded as JPEG, typically shrinking the payload
+    by an order of magnitude. Run in a worker.
+    """
+    # Image.open only reads the header here, so the size check is cheap
+    with Image.open(image_path) as image:
+        if max(image.size) > MAX_UPLOAD_EDGE:
+            image.thumbnail((MAX_UPLOAD_EDGE, MAX_UPLOAD_EDGE), Image.Resampling.LANCZOS)
+            with io.BytesIO() as buffer:
+                image.convert('RGB').save(buffer, format="JPEG", quality=92)
+                data = buffer.getvalue()
+        else:
+            data = None
+
+    if data is None:
+        data = image_path.read_bytes()
+
+    encoded = _b64.b64encode(data).decode('ascii')
+    del data
+    return encoded
+
+
+async def process_image(client, file_manager, image_path, progress_q=None, ledger=None):
     """Process single image to 3D"""
     try:
         print(f"\n{'='*60}")
         print(f"Processing: {image_path.name}")
         print(f"{'='*60}")
+
+        # Resume from the ledger: completed jobs are skipped outright and
+        # already-submitted jobs go straight to polling - interrupted runs
+        # never pay for the same Tencent job twice
+        entry = (ledger or {}).get(image_path.stem)
+        if entry and entry.get("status") == "DONE" and os.path.exists(entry.get("output", "")):
+            print(f"⏭️  Already done (ledger): {entry['output']}")
+            return entry["output"]
+
+        if entry and entry.get("status") == "SUBMITTED" and entry.get("job_id"):
+            job_id = entry["job_id"]
+            print(f"▶️  Resuming submitted job: {job_id}")
+        else:
+            # Convert to base64 in the encoding process pool so the decode/
+            # resize/base64 work for concurrent jobs runs on separate cores
+            # instead of fighting over the GIL. Raw file bytes are sent when
+            # the API accepts the format directly.
+            loop = asyncio.get_running_loop()
+            if image_path.suffix.lower() in API_NATIVE_EXTENSIONS:
+                image_base64 = await loop.run_in_executor(_get_cpu_pool(), _read_file_b64, image_path)
+            else:
+                image_base64 = await loop.run_in_executor(_get_cpu_pool(), _encode_png_b64, image_path)
+
+            # Submit task
+            print("📤 Submitting to Hunyuan 3D API...")
+            job_id = await client.image_to_3d(
+                image_base64,
+                ENABLE_PBR,
+                FACE_COUNT,
+                GENERATE_TYPE,
+                POLYGON_TYPE
+            )
+
+            if not job_id:
+                raise Exception("Failed to get JobId")
+
+            print(f"✅ Job ID: {job_id}")
+            _append_ledger({"image": image_path.stem, "job_id": job_id, "status": "SUBMITTED"})
         
-        # Load image and convert to base64
-        from PIL import Image
-        import base64
-        import io
-        
-        image = Image.open(image_path)
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        
-        # Submit task
-        print("📤 Submitting to Hunyuan 3D API...")
-        job_id = await client.image_to_3d(
-            image_base64, 
-            ENABLE_PBR, 
-            FACE_COUNT, 
-            GENERATE_TYPE, 
-            POLYGON_TYPE
-        )
-        
-        if not job_id:
-            raise Exception("Failed to get JobId")
-        
-        print(f"✅ Job ID: {job_id}")
-        
-        # Wait for completion
-        def progress_callback(percent, message):
-            print(f"\r⏳ Progress: {message} ({percent:.1f}%)", end='', flush=True)
-        
+        # Wait for completion - route progress through the shared renderer
+        # queue when running concurrently, print directly otherwise
+        if progress_q is not None:
+            def progress_callback(percent, message):
+                progress_q.put_nowait((image_path.name, percent, message))
+        else:
+            def progress_callback(percent, message):
+                print(f"\r⏳ Progress: {message} ({percent:.1f}%)", end='', flush=True)
+
         result = await client.wait_for_task_completion(
             job_id,
             MAX_WAIT_TIME,
             progress_callback=progress_callback
         )
-        print()  # New line
+        if progress_q is None:
+            print()  # New line
         
-        # Get GLB URL
+        # Collect all result files (PBR jobs return GLB plus texture files)
         result_files = result.get("result_urls", [])
-        glb_url = None
+        output_dir = Path(OUTPUT_FOLDER)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        glb_path = None
+        targets = []
         for file_info in result_files:
-            if file_info.get("type") == "GLB":
-                glb_url = file_info.get("url")
-                break
-        
-        if not glb_url:
+            url = file_info.get("url")
+            if not url:
+                continue
+            file_type = file_info.get("type") or "bin"
+            target = output_dir / f"{image_path.stem}_3d.{file_type.lower()}"
+            if file_type == "GLB":
+                glb_path = target
+            targets.append((url, target))
+
+        if glb_path is None:
             raise Exception("No GLB file in results")
-        
-        # Download model
-        output_filename = f"{image_path.stem}_3d.glb"
-        output_path = Path(OUTPUT_FOLDER) / output_filename
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        print(f"⬇️  Downloading model...")
-        await client.download_model(glb_url, str(output_path))
-        
-        print(f"✅ Saved: {output_path}")
-        return str(output_path)
+
+        # Download result files concurrently over the shared session
+        print(f"⬇️  Downloading {len(targets)} file(s)...")
+        await asyncio.gather(
+            *(client.download_model(url, str(target)) for url, target in targets)
+        )
+
+        print(f"✅ Saved: {glb_path}")
+        _append_ledger({
+            "image": image_path.stem,
+            "job_id": job_id,
+            "status": "DONE",
+            "output": str(glb_path)
+        })
+        return str(glb_path)
         
     except Exception as e:
         print(f"❌ Error processing {image_path.name}: {e}")
         return None
 
 
+# Process pool for CPU-bound image encoding - sidesteps the GIL so decode,
+# resize and base64 for several images run on separate cores while the
+# event loop keeps pumping network I/O
+_cpu_pool = None
+
+
+def _get_cpu_pool():
+    """Lazily create the shared encoding process pool"""
+    global _cpu_pool
+    if _cpu_pool is None:
+        _cpu_pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _cpu_pool
+
+
+def _load_ledger():
+    """Load the job ledger from previous runs (last entry per image wins)"""
+    ledger = {}
+    if os.path.exists(LEDGER_FILE):
+        with open(LEDGER_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                ledger[entry.get("image")] = entry
+    return ledger
+
+
+def _append_ledger(entry):
+    """Append a state change to the job ledger"""
+    with open(LEDGER_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def _group_duplicates(images):
+    """Group image paths by content hash so duplicates are submitted once"""
+    groups = {}
+    for path in images:
+        digest = _content_hash(path.read_bytes()).hexdigest()
+        groups.setdefault(digest, []).append(path)
+    return list(groups.values())
+
+
+async def _render_progress(progress_q, total):
+    """Single consumer that coalesces all jobs' progress into one status line
+
+    Concurrent jobs would otherwise interleave their own carriage-return
+    prints into garbage; instead each job enqueues updates and this task
+    redraws a summary line at most every 200ms.
+    """
+    latest = {}
+    done = False
+    while not done:
+        # Drain everything queued since the last redraw
+        while True:
+            try:
+                item = progress_q.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is None:
+                done = True
+            else:
+                name, percent, _message = item
+                latest[name] = percent
+
+        if latest:
+            running = sum(1 for p in latest.values() if p < 100)
+            finished = len(latest) - running
+            avg = sum(latest.values()) / len(latest)
+            print(f"\r⏳ {len(latest)}/{total} jobs started | "
+                  f"{running} running | {finished} finished | avg {avg:.0f}%   ",
+                  end='', flush=True)
+
+        if not done:
+            await asyncio.sleep(0.2)
+    print()
+
+
+async def _process_group(client, file_manager, group, progress_q=None, ledger=None):
+    """Process one unique image and link the result to its duplicates"""
+    primary = group[0]
+    result = await process_image(client, file_manager, primary, progress_q, ledger)
+
+    if result:
+        for duplicate in group[1:]:
+            link_path = Path(OUTPUT_FOLDER) / f"{duplicate.stem}_3d.glb"
+            try:
+                if link_path.exists():
+                    link_path.unlink()
+                os.link(result, link_path)
+            except OSError:
+                # Cross-device or FS without hardlinks - fall back to a copy
+                shutil.copyfile(result, link_path)
+            print(f"🔗 Linked duplicate: {duplicate.name} -> {link_path.name}")
+
+    return result
+
+
+async def _bounded(sem, coro):
+    """Run coroutine while holding the concurrency semaphore"""
+    async with sem:
+        return await coro
+
+
 async def main():
     """Main batch processing function"""
     print("""
@@ -159,19 +386,36 @@ async def main():
     client = TencentCloudAPIClient(SECRET_ID, SECRET_KEY, REGION)
     file_manager = FileManager()
     
-    # Process each image
-    print(f"\n🚀 Starting batch processing...")
-    successful = 0
-    failed = 0
-    
-    for idx, image_path in enumerate(images, 1):
-        print(f"\n[{idx}/{len(images)}]")
-        result = await process_image(client, file_manager, image_path)
-        
-        if result:
-            successful += 1
-        else:
-            failed += 1
+    # Deduplicate by content hash - each unique image is submitted once and
+    # its GLB is hardlinked to every duplicate's output path
+    groups = await asyncio.to_thread(_group_duplicates, images)
+    duplicates = len(images) - len(groups)
+    if duplicates:
+        print(f"♻️  {duplicates} duplicate image(s) detected - submitting {len(groups)} unique jobs")
+
+    # Process images concurrently (bounded by MAX_CONCURRENT)
+    print(f"\n🚀 Starting batch processing ({MAX_CONCURRENT} concurrent jobs)...")
+    # Load the resume ledger so interrupted runs skip paid-for jobs
+    ledger = _load_ledger()
+    if ledger:
+        print(f"📒 Loaded ledger with {len(ledger)} previous job(s)")
+
+    try:
+        sem = asyncio.Semaphore(MAX_CONCURRENT)
+        progress_q = asyncio.Queue()
+        renderer = asyncio.create_task(_render_progress(progress_q, len(groups)))
+        tasks = [
+            asyncio.create_task(_bounded(sem, _process_group(client, file_manager, group, progress_q, ledger)))
+            for group in groups
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        progress_q.put_nowait(None)  # Stop the renderer
+        await renderer
+    finally:
+        await client.close()
+
+    successful = sum(1 for r in results if r and not isinstance(r, Exception))
+    failed = len(results) - successful
     
     # Summary
     print(f"\n{'='*60}")
@@ -7,12 +7,44 @@ import asyncio
 import logging
 import aiohttp
 from typing import Dict, Any, Optional
+
+# aiofiles enables fully async disk writes; fall back to thread offload
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
+# Download chunk size for streaming model files (1 MB)
+DOWNLOAD_CHUNK_SIZE = 1 << 20
 from tencentcloud.common.common_client import CommonClient
 from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
 from tencentcloud.common.profile.client_profile import ClientProfile
 from tencentcloud.common.profile.http_profile import HttpProfile
 
+# Route the SDK's JSON response parsing through orjson when available.
+# QueryHunyuanTo3DProJob is polled many times per job and DONE responses
+# carry large signed URLs, so the faster parser is worth the shim. The
+# patch is scoped to the SDK modules instead of mutating stdlib json.
+try:
+    import json as _json
+    import orjson as _orjson
+
+    class _FastJson:
+        """Minimal json-module shim with orjson-backed loads"""
+        loads = staticmethod(_orjson.loads)
+        dumps = staticmethod(_json.dumps)
+        JSONDecodeError = _json.JSONDecodeError
+
+    from tencentcloud.common import abstract_client as _tc_abstract_client
+    from tencentcloud.common import common_client as _tc_common_client
+
+    for _tc_module in (_tc_abstract_client, _tc_common_client):
+        if getattr(_tc_module, "json", None) is _json:
+            _tc_module.json = _FastJson
+except ImportError:
+    pass
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +55,59 @@ class TencentCloudAPIClient:
     Tencent Cloud Hunyuan 3D Global API client
     Uses CommonClient for Global API access
     """
-    
+
+    # Common error explanations (built once at class creation; _format_error
+    # runs on every SDK exception and must not rebuild these)
+    _ERROR_HINTS = {
+        "ResourceInsufficient": """
+❌ KAYNAK YETERSİZ (ResourceInsufficient)
+
+Olası Nedenler:
+1. 🔴 Hesap Kotası Doldu
+   - Günlük/aylık ücretsiz kota tükendi
+   - Çözüm: Tencent Cloud Console'dan kotanızı kontrol edin
+
+2. 💰 Yetersiz Bakiye
+   - API ücretli ve hesapta yeterli kredi yok
+   - Çözüm: Hesabınıza bakiye yükleyin
+
+3. 🔒 API Erişim Kısıtlaması
+   - Global API (Hunyuan 3D Pro) erişiminiz aktif değil
+   - Çözüm: Tencent Cloud'dan API'yi aktifleştirin
+
+4. 📊 Eş Zamanlı İstek Limiti
+   - Çok fazla eş zamanlı istek gönderildi
+   - Çözüm: Biraz bekleyip tekrar deneyin
+
+Kontrol Edin:
+- https://console.intl.cloud.tencent.com/ (Global Console)
+- Billing & Cost Management
+- API Gateway -> Hunyuan 3D Services
+""",
+        "AuthFailure": """
+❌ KİMLİK DOĞRULAMA HATASI (AuthFailure)
+
+Çözüm:
+- Secret ID ve Secret Key'i kontrol edin
+- Kimlik bilgilerinin Global API için olduğundan emin olun
+""",
+        "LimitExceeded": """
+❌ LİMİT AŞILDI (LimitExceeded)
+
+Çözüm:
+- API çağrı limiti aşıldı
+- Birkaç dakika bekleyip tekrar deneyin
+""",
+        "InvalidParameter": """
+❌ GEÇERSİZ PARAMETRE (InvalidParameter)
+
+Çözüm:
+- Gönderilen parametreleri kontrol edin
+- face_count: 40000-1500000 arasında olmalı
+- generate_type: Normal/LowPoly/Geometry/Sketch
+"""
+    }
+
     def __init__(self, secret_id: str, secret_key: str, region: str = "ap-singapore"):
         """
         Initialize the Global API client
@@ -58,8 +142,35 @@ class TencentCloudAPIClient:
             profile=clientProfile
         )
         
+        # Shared HTTP session for downloads - created lazily, reused across
+        # calls so TCP/TLS handshakes are paid once per host, not per file
+        self._session: Optional[aiohttp.ClientSession] = None
+
         logger.info(f"Initialized Tencent Cloud Hunyuan 3D Global client for region: {region}")
-        
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get or lazily create the shared download session"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        # Open the pooled session up front so every request in the block
+        # reuses its keep-alive connections
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
     async def text_to_3d(self, prompt: str, enable_pbr: bool = False, face_count: int = 500000, 
                         generate_type: str = "Normal", polygon_type: str = "triangle") -> str:
         """
@@ -91,15 +202,13 @@ class TencentCloudAPIClient:
             if generate_type == "LowPoly":
                 params["PolygonType"] = polygon_type
             
-            # Submit job (sync call, wrap in executor for async)
-            loop = asyncio.get_event_loop()
-            resp = await loop.run_in_executor(
-                None, 
+            # Submit job (sync SDK call, run on the shared default executor)
+            resp = await asyncio.to_thread(
                 self.client.call_json,
                 "SubmitHunyuanTo3DProJob",
                 params
             )
-            
+
             job_id = resp["Response"]["JobId"]
             logger.info(f"Text-to-3D job submitted successfully. JobId: {job_id}")
             return job_id
@@ -112,46 +221,53 @@ class TencentCloudAPIClient:
             logger.error(f"Error submitting text-to-3D job: {e}")
             raise
         
-    async def image_to_3d(self, image_data: str, enable_pbr: bool = False, face_count: int = 500000,
-                         generate_type: str = "Normal", polygon_type: str = "triangle") -> str:
+    async def image_to_3d(self, image_data: Optional[str] = None, enable_pbr: bool = False,
+                         face_count: int = 500000, generate_type: str = "Normal",
+                         polygon_type: str = "triangle", image_url: Optional[str] = None) -> str:
         """
         Generate 3D model from image
-        
+
         Args:
             image_data: Base64 encoded image data
             enable_pbr: Enable PBR material generation (default: False)
             face_count: Number of faces in generated model, 40000-1500000 (default: 500000)
             generate_type: Generation type - Normal/LowPoly/Geometry/Sketch (default: Normal)
             polygon_type: Polygon type for LowPoly - triangle/quadrilateral (default: triangle)
-            
+            image_url: URL of an already-hosted image, used instead of
+                image_data; skips the base64 payload entirely
+
         Returns:
             Job ID string
         """
         try:
             logger.info("Starting image-to-3D generation")
             logger.info(f"Settings: PBR={enable_pbr}, Faces={face_count}, Type={generate_type}")
-            
-            # Prepare parameters
+
+            # Prepare parameters. A URL reference keeps the multi-MB
+            # base64 blob out of the request body when one is available
             params = {
-                "ImageBase64": image_data,
                 "EnablePBR": enable_pbr,
                 "FaceCount": face_count,
                 "GenerateType": generate_type
             }
+            if image_url:
+                params["ImageUrl"] = image_url
+            elif image_data:
+                params["ImageBase64"] = image_data
+            else:
+                raise ValueError("Either image_data or image_url is required")
             
             # Add polygon type only for LowPoly mode
             if generate_type == "LowPoly":
                 params["PolygonType"] = polygon_type
             
-            # Submit job (sync call, wrap in executor for async)
-            loop = asyncio.get_event_loop()
-            resp = await loop.run_in_executor(
-                None,
+            # Submit job (sync SDK call, run on the shared default executor)
+            resp = await asyncio.to_thread(
                 self.client.call_json,
                 "SubmitHunyuanTo3DProJob",
                 params
             )
-            
+
             job_id = resp["Response"]["JobId"]
             logger.info(f"Image-to-3D job submitted successfully. JobId: {job_id}")
             return job_id
@@ -186,10 +302,8 @@ class TencentCloudAPIClient:
                 "JobId": job_id
             }
             
-            # Query job (sync call, wrap in executor for async)
-            loop = asyncio.get_event_loop()
-            resp = await loop.run_in_executor(
-                None,
+            # Query job (sync SDK call, run on the shared default executor)
+            resp = await asyncio.to_thread(
                 self.client.call_json,
                 "QueryHunyuanTo3DProJob",
                 params
@@ -224,29 +338,68 @@ class TencentCloudAPIClient:
             logger.error(f"Error querying task status: {e}")
             raise
         
-    async def wait_for_task_completion(self, job_id: str, max_wait_time: int = 300, poll_interval: int = 5, progress_callback=None) -> Dict[str, Any]:
+    async def wait_for_task_completion(self, job_id: str, max_wait_time: int = 300,
+                                       base_interval: float = 2.0, max_interval: float = 15.0,
+                                       poll_depth: int = 1,
+                                       progress_callback=None) -> Dict[str, Any]:
         """
         Wait for a task to complete
-        
+
+        Polls with exponential backoff: early probes are cheap, steady-state
+        polling is sparse so long jobs don't burn API quota (LimitExceeded).
+
         Args:
             job_id: Job ID to wait for
             max_wait_time: Maximum time to wait in seconds (default: 300)
-            poll_interval: Polling interval in seconds (default: 5)
+            base_interval: Initial polling interval in seconds (default: 2.0)
+            max_interval: Maximum polling interval in seconds (default: 15.0)
+            poll_depth: Overlapping status queries to keep in flight
+                (default: 1; >1 trades extra API calls for lower latency)
             progress_callback: Optional callback function(progress_percent, status_msg)
-            
+
         Returns:
             Task result dictionary
         """
         logger.info(f"Waiting for task completion. JobId: {job_id}")
-        
-        elapsed_time = 0
+
+        elapsed_time = 0.0
         started_running = False
-        run_start_time = 0
-        
+        run_start_time = 0.0
+        attempts = 0
+        growth = 1.5
+        last_status = None
+        inflight = set()
+
         while elapsed_time < max_wait_time:
-            result = await self.query_task_status(job_id)
+            if poll_depth > 1:
+                # Status queries are idempotent GETs, so they tolerate
+                # overlap: keeping several in flight lets reply handling
+                # overlap the next request's round-trip
+                while len(inflight) < poll_depth:
+                    inflight.add(asyncio.ensure_future(self.query_task_status(job_id)))
+                done_tasks, inflight = await asyncio.wait(
+                    inflight, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Retrieve every completed poll - dropping one would waste
+                # the API call and leave raised exceptions unretrieved -
+                # and act on the most advanced status among the replies
+                result = None
+                for task in done_tasks:
+                    polled = task.result()
+                    if result is None or polled["status"] in ("DONE", "FAIL"):
+                        result = polled
+            else:
+                result = await self.query_task_status(job_id)
             status = result["status"]
-            
+
+            # Any state transition is fresh information - reset the backoff
+            # so the next phase is probed quickly again. (The reported
+            # percent is synthesized from elapsed time, so the status field
+            # is the only real signal of change.)
+            if status != last_status:
+                attempts = 0
+                last_status = status
+
             # Calculate estimated progress
             if status == "WAIT":
                 progress = min(10, (elapsed_time / max_wait_time) * 10)
@@ -263,111 +416,139 @@ class TencentCloudAPIClient:
             else:
                 progress = 95
                 status_msg = f"⚙️ İşleniyor... ({int(progress)}%)"
-            
+
             # Call progress callback if provided
             if progress_callback:
                 progress_callback(progress, status_msg)
-            
+
             if status == "DONE":
+                for task in inflight:
+                    task.cancel()
                 if progress_callback:
                     progress_callback(100, "✅ Tamamlandı!")
-                logger.info(f"Task completed successfully after {elapsed_time} seconds")
+                logger.info(f"Task completed successfully after {elapsed_time:.0f} seconds")
                 return result
             elif status == "FAIL":
+                for task in inflight:
+                    task.cancel()
                 error_msg = f"Task failed: {result['error_code']} - {result['error_message']}"
                 logger.error(error_msg)
                 raise Exception(error_msg)
-            
-            # Still waiting or running
-            await asyncio.sleep(poll_interval)
-            elapsed_time += poll_interval
-            logger.info(f"Task status: {status}, elapsed time: {elapsed_time}s")
-        
+
+            # Still waiting or running - back off exponentially, but keep
+            # probing fast while the job is freshly queued
+            if status == "WAIT" and elapsed_time < 10:
+                interval = base_interval
+            else:
+                interval = min(max_interval, base_interval * (growth ** attempts))
+                attempts += 1
+
+            await asyncio.sleep(interval)
+            elapsed_time += interval
+            logger.info(f"Task status: {status}, elapsed time: {elapsed_time:.0f}s")
+
+        for task in inflight:
+            task.cancel()
         raise Exception(f"Task did not complete within {max_wait_time} seconds")
         
-    async def download_model(self, url: str, output_path: str) -> str:
+    async def _download_ranged(self, session: aiohttp.ClientSession, url: str,
+                               output_path: str, parts: int,
+                               chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
+        """
+        Download a file with several parallel HTTP range requests
+
+        Args:
+            session: Shared client session
+            url: Download URL (must support byte ranges)
+            output_path: Local path to save the file
+            parts: Number of parallel range requests
+            chunk_size: Streaming chunk size in bytes
+
+        Returns:
+            Path to the downloaded file
+        """
+        async with session.head(url, allow_redirects=True) as head:
+            if head.status != 200:
+                raise Exception(f"HEAD failed: HTTP {head.status}")
+            if head.headers.get("Accept-Ranges", "").lower() != "bytes":
+                raise Exception("Server does not support range requests")
+            total_size = int(head.headers.get("Content-Length", 0))
+
+        # Splitting only pays off for files that outgrow a single chunk
+        if total_size < parts * chunk_size:
+            raise Exception("File too small for ranged download")
+
+        # Preallocate so each part can write at its own offset
+        with open(output_path, 'wb') as f:
+            f.truncate(total_size)
+
+        part_size = -(-total_size // parts)  # Ceiling division
+
+        async def _fetch_part(index: int):
+            start = index * part_size
+            end = min(start + part_size, total_size) - 1
+            headers = {"Range": f"bytes={start}-{end}"}
+            async with session.get(url, headers=headers) as response:
+                if response.status != 206:
+                    raise Exception(f"Range request failed: HTTP {response.status}")
+                with open(output_path, 'r+b') as f:
+                    f.seek(start)
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        await asyncio.to_thread(f.write, chunk)
+
+        await asyncio.gather(*(_fetch_part(i) for i in range(parts)))
+        logger.info(f"Model downloaded in {parts} parts to {output_path}")
+        return output_path
+
+    async def download_model(self, url: str, output_path: str, parts: int = 1,
+                             chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
         """
         Download the generated 3D model
-        
+
         Args:
             url: Download URL
             output_path: Local path to save the model
-            
+            parts: Parallel range requests to use for large files (default: 1)
+            chunk_size: Streaming chunk size in bytes (default: 1 MB)
+
         Returns:
             Path to the downloaded file
         """
         try:
             logger.info(f"Downloading model from {url}")
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        with open(output_path, 'wb') as f:
-                            f.write(await response.read())
-                        logger.info(f"Model downloaded successfully to {output_path}")
-                        return output_path
-                    else:
-                        raise Exception(f"Failed to download model: HTTP {response.status}")
-                        
+
+            session = await self._get_session()
+
+            # Try parallel ranges first when requested; any failure (no
+            # range support, tiny file) falls back to plain streaming
+            if parts > 1:
+                try:
+                    return await self._download_ranged(session, url, output_path, parts, chunk_size)
+                except Exception as e:
+                    logger.warning(f"Ranged download unavailable ({e}), streaming instead")
+            async with session.get(url) as response:
+                if response.status != 200:
+                    raise Exception(f"Failed to download model: HTTP {response.status}")
+
+                # Stream to disk chunk by chunk so memory stays O(chunk)
+                # instead of O(file) for large GLB models
+                if aiofiles is not None:
+                    async with aiofiles.open(output_path, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            await f.write(chunk)
+                else:
+                    with open(output_path, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            await asyncio.to_thread(f.write, chunk)
+
+                logger.info(f"Model downloaded successfully to {output_path}")
+                return output_path
+
         except Exception as e:
             logger.error(f"Error downloading model: {e}")
             raise
     
     def _format_error(self, e: TencentCloudSDKException) -> str:
         """Format Tencent Cloud error with helpful information"""
-        error_code = e.code
-        error_message = e.message
-        
-        # Common error explanations
-        error_hints = {
-            "ResourceInsufficient": """
-❌ KAYNAK YETERSİZ (ResourceInsufficient)
-
-Olası Nedenler:
-1. 🔴 Hesap Kotası Doldu
-   - Günlük/aylık ücretsiz kota tükendi
-   - Çözüm: Tencent Cloud Console'dan kotanızı kontrol edin
-   
-2. 💰 Yetersiz Bakiye
-   - API ücretli ve hesapta yeterli kredi yok
-   - Çözüm: Hesabınıza bakiye yükleyin
-   
-3. 🔒 API Erişim Kısıtlaması
-   - Global API (Hunyuan 3D Pro) erişiminiz aktif değil
-   - Çözüm: Tencent Cloud'dan API'yi aktifleştirin
-   
-4. 📊 Eş Zamanlı İstek Limiti
-   - Çok fazla eş zamanlı istek gönderildi
-   - Çözüm: Biraz bekleyip tekrar deneyin
-
-Kontrol Edin:
-- https://console.intl.cloud.tencent.com/ (Global Console)
-- Billing & Cost Management
-- API Gateway -> Hunyuan 3D Services
-""",
-            "AuthFailure": """
-❌ KİMLİK DOĞRULAMA HATASI (AuthFailure)
-
-Çözüm:
-- Secret ID ve Secret Key'i kontrol edin
-- Kimlik bilgilerinin Global API için olduğundan emin olun
-""",
-            "LimitExceeded": """
-❌ LİMİT AŞILDI (LimitExceeded)
-
-Çözüm:
-- API çağrı limiti aşıldı
-- Birkaç dakika bekleyip tekrar deneyin
-""",
-            "InvalidParameter": """
-❌ GEÇERSİZ PARAMETRE (InvalidParameter)
-
-Çözüm:
-- Gönderilen parametreleri kontrol edin
-- face_count: 40000-1500000 arasında olmalı
-- generate_type: Normal/LowPoly/Geometry/Sketch
-"""
-        }
-        
-        hint = error_hints.get(error_code, "")
-        return f"[{error_code}] {error_message}\n{hint}"
+        hint = self._ERROR_HINTS.get(e.code, "")
+        return f"[{e.code}] {e.message}\n{hint}"
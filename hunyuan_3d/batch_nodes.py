@@ -3,7 +3,9 @@ Batch Processing Nodes for Hunyuan3D v3
 """
 
 import os
-import glob
+import sys
+import functools
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Any, Tuple, List
 import asyncio
@@ -12,7 +14,45 @@ import io
 from PIL import Image
 
 from .api_client import TencentCloudAPIClient
-from .file_manager import FileManager
+from .nodes import HunyuanConfig, _FM, _run_coro
+
+# Resample filters selectable for the pre-upload downscale. BICUBIC is the
+# default: the 3D API's output is indistinguishable from LANCZOS input while
+# the resize itself is much cheaper (4x4 kernel vs 6x6)
+RESIZE_FILTERS = {
+    "bicubic": Image.Resampling.BICUBIC,
+    "bilinear": Image.Resampling.BILINEAR,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class JobSpec:
+    """Per-batch settings shared by every image job
+
+    Bound once in batch_generate instead of marshalling eight identical
+    arguments through every _process_single_image call.
+    """
+    output_folder: str
+    enable_pbr: bool
+    face_count: int
+    generate_type: str
+    polygon_type: str
+    max_wait_time: int
+    resize_filter: str = "bicubic"
+    download_parts: int = 1
+
+
+@functools.lru_cache(maxsize=1)
+def _list_input_subdirs(input_dir: str, mtime_ns: int) -> tuple:
+    """List subdirectories of the input dir, cached until the dir changes
+
+    INPUT_TYPES runs on every UI refresh; keying the cache on the
+    directory's mtime_ns makes it self-invalidating when folders are
+    added or removed.
+    """
+    with os.scandir(input_dir) as entries:
+        return tuple(entry.name for entry in entries if entry.is_dir(follow_symlinks=False))
 
 
 class HunyuanBatchImageTo3DNode:
@@ -22,18 +62,14 @@ class HunyuanBatchImageTo3DNode:
     
     @classmethod
     def INPUT_TYPES(cls):
-        # Get available folders from input directory
+        # Get available folders from input directory (cached per dir mtime)
+        folders = ["input"]  # Default
         try:
             import folder_paths
             input_dir = folder_paths.get_input_directory()
-            # List all subdirectories
-            folders = ["input"]  # Default
-            if os.path.exists(input_dir):
-                subdirs = [d for d in os.listdir(input_dir) if os.path.isdir(os.path.join(input_dir, d))]
-                if subdirs:
-                    folders.extend(subdirs)
-        except:
-            folders = ["input"]
+            folders.extend(_list_input_subdirs(input_dir, os.stat(input_dir).st_mtime_ns))
+        except (ImportError, OSError):
+            pass
         
         return {
             "required": {
@@ -46,7 +82,10 @@ class HunyuanBatchImageTo3DNode:
                 "generate_type": (["Normal", "LowPoly", "Geometry", "Sketch"], {"default": "Normal"}),
                 "polygon_type": (["triangle", "quadrilateral"], {"default": "triangle"}),
                 "max_wait_time": ("INT", {"default": 600, "min": 60, "max": 3600, "step": 60}),
-                "max_images": ("INT", {"default": 10, "min": 1, "max": 100, "step": 1})
+                "max_images": ("INT", {"default": 10, "min": 1, "max": 100, "step": 1}),
+                "max_concurrency": ("INT", {"default": 4, "min": 1, "max": 20, "step": 1}),
+                "resize_filter": (list(RESIZE_FILTERS), {"default": "bicubic"}),
+                "download_parts": ("INT", {"default": 4, "min": 1, "max": 16, "step": 1})
             }
         }
     
@@ -57,59 +96,78 @@ class HunyuanBatchImageTo3DNode:
     CATEGORY = "Hunyuan3D/v3"
     
     def __init__(self):
-        self.file_manager = FileManager()
-    
+        self.file_manager = _FM
+        # Resolve ComfyUI's I/O directories once per node instance instead
+        # of re-importing folder_paths in every hot-path call; resolved
+        # output folders (with makedirs already done) are memoized too
+        try:
+            import folder_paths
+            self._input_dir = folder_paths.get_input_directory()
+            self._output_dir = folder_paths.get_output_directory()
+        except Exception:
+            self._input_dir = None
+            self._output_dir = None
+        self._resolved_output_dirs = {}
+
     def _get_image_files(self, input_folder: str, pattern: str, max_images: int) -> List[Path]:
         """Get list of image files from folder"""
         try:
-            import folder_paths
-            
             # Check if absolute path
             if os.path.isabs(input_folder):
                 search_path = input_folder
             elif input_folder == "input":
-                search_path = folder_paths.get_input_directory()
+                search_path = self._input_dir
             else:
                 # Relative to ComfyUI input directory
-                search_path = os.path.join(folder_paths.get_input_directory(), input_folder)
-            
-            # Search for files matching pattern
-            pattern_path = os.path.join(search_path, pattern)
-            files = glob.glob(pattern_path)
-            
-            # Sort and limit
-            files = sorted(files)[:max_images]
-            return [Path(f) for f in files]
+                search_path = os.path.join(self._input_dir, input_folder)
+
+            # Path.glob yields Path objects directly - no string list plus
+            # per-entry Path() conversion pass afterwards
+            return sorted(Path(search_path).glob(pattern))[:max_images]
         except Exception as e:
             print(f"❌ Error getting image files: {e}")
             return []
-    
+
     def _get_output_path(self, output_folder: str, filename: str) -> str:
         """Get full output path for GLB file"""
         try:
-            import folder_paths
-            
-            # Check if absolute path
-            if os.path.isabs(output_folder):
-                full_output_dir = output_folder
-            else:
-                # Relative to ComfyUI output directory
-                output_dir = folder_paths.get_output_directory()
-                full_output_dir = os.path.join(output_dir, output_folder)
-            
-            # Create folder
-            os.makedirs(full_output_dir, exist_ok=True)
-            
+            full_output_dir = self._resolved_output_dirs.get(output_folder)
+            if full_output_dir is None:
+                # Check if absolute path
+                if os.path.isabs(output_folder):
+                    full_output_dir = output_folder
+                else:
+                    # Relative to ComfyUI output directory
+                    full_output_dir = os.path.join(self._output_dir, output_folder)
+
+                # Create folder once; later files in the batch reuse the entry
+                os.makedirs(full_output_dir, exist_ok=True)
+                self._resolved_output_dirs[output_folder] = full_output_dir
+
             return os.path.join(full_output_dir, filename)
         except Exception as e:
             print(f"❌ Error creating output path: {e}")
             # Fallback to models/3d_models
             return self.file_manager.get_output_path(filename)
     
-    def _image_to_base64(self, image_path: Path) -> str:
-        """Convert image file to base64"""
+    def _image_to_base64(self, image_path: Path, resize_filter: str = "bicubic") -> str:
+        """Convert image file to base64 (CPU-bound, call via asyncio.to_thread)"""
         image = Image.open(image_path)
-        
+
+        # Resize to reasonable size (API limit considerations)
+        max_size = 1024  # Reduced from 2048 for smaller file size
+
+        # Small RGB JPEGs need no processing at all - base64 the original
+        # file bytes and skip the decode + re-encode entirely
+        if image.format == "JPEG" and image.mode == "RGB" and max(image.size) <= max_size:
+            image.close()
+            return base64.b64encode(image_path.read_bytes()).decode('ascii')
+
+        # For JPEG sources, draft() tells the decoder to return a pre-scaled
+        # image (reduced DCT scale), cutting decode time before any resize
+        if image.format == "JPEG":
+            image.draft("RGB", (max_size, max_size))
+
         # Convert to RGB if needed (for JPEG)
         if image.mode in ('RGBA', 'LA', 'P'):
             background = Image.new('RGB', image.size, (255, 255, 255))
@@ -120,17 +178,17 @@ class HunyuanBatchImageTo3DNode:
         elif image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Resize to reasonable size (API limit considerations)
-        max_size = 1024  # Reduced from 2048 for smaller file size
+        # Final fit if draft couldn't get us all the way down
         if max(image.size) > max_size:
             ratio = max_size / max(image.size)
             new_size = tuple(int(dim * ratio) for dim in image.size)
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
+            image = image.resize(new_size, RESIZE_FILTERS.get(resize_filter, Image.Resampling.BICUBIC))
         
-        # Convert to base64 with JPEG compression
+        # Convert to base64 with JPEG compression; getbuffer() hands the
+        # encoder a memoryview instead of copying the bytes out first
         buffer = io.BytesIO()
         image.save(buffer, format="JPEG", quality=85, optimize=True)
-        base64_str = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        base64_str = base64.b64encode(buffer.getbuffer()).decode('ascii')
         
         # Check size and warn
         size_mb = len(base64_str) / (1024 * 1024)
@@ -139,22 +197,70 @@ class HunyuanBatchImageTo3DNode:
         
         return base64_str
     
+    async def _drain_progress(self, progress_q: asyncio.Queue, total: int):
+        """Coalesce all jobs' progress updates into one line at <= 4 Hz
+
+        Concurrent jobs pushing carriage-return prints would interleave
+        into garbage and take the stdout lock on every poll; instead they
+        enqueue updates and this task redraws a single aggregate line.
+        """
+        latest = {}
+        done = False
+        while not done:
+            # Drain everything queued since the last redraw
+            while True:
+                try:
+                    item = progress_q.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    done = True
+                else:
+                    name, percent, _message = item
+                    latest[name] = percent
+
+            if latest:
+                running = sum(1 for p in latest.values() if p < 100)
+                finished = len(latest) - running
+                avg = sum(latest.values()) / len(latest)
+                sys.stdout.write(f"\r⏳ {len(latest)}/{total} jobs started | "
+                                 f"{running} running | {finished} finished | avg {avg:.0f}%   ")
+                sys.stdout.flush()
+
+            if not done:
+                await asyncio.sleep(0.25)
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
     async def _process_single_image(self, client: TencentCloudAPIClient, image_path: Path,
-                                    output_folder: str, enable_pbr: bool, face_count: int, 
-                                    generate_type: str, polygon_type: str, max_wait_time: int) -> Tuple[str, bool, str]:
+                                    spec: JobSpec,
+                                    progress_q: asyncio.Queue = None) -> Tuple[str, bool, str]:
         """Process single image and return (path, success, message)"""
         try:
             print(f"\n{'='*60}")
             print(f"📷 Processing: {image_path.name}")
             print(f"{'='*60}")
-            
-            # Convert to base64
-            image_data = self._image_to_base64(image_path)
-            
+
+            # Convert to base64 in a thread so encoding image K+1 overlaps
+            # with the network wait for image K. Repeat runs over the same
+            # folder hit the content-addressed cache and skip the encode.
+            # The encoding settings are part of the cache key, so switching
+            # e.g. the resize filter re-encodes instead of serving an entry
+            # made with the old settings (quality/size match _image_to_base64)
+            encode_params = f"{spec.resize_filter}|jpeg85|1024"
+            image_data = await asyncio.to_thread(
+                self.file_manager.get_encoded_cache, image_path, encode_params
+            )
+            if image_data is None:
+                image_data = await asyncio.to_thread(self._image_to_base64, image_path, spec.resize_filter)
+                await asyncio.to_thread(
+                    self.file_manager.put_encoded_cache, image_path, image_data, encode_params
+                )
+
             # Submit task
             print("📤 Submitting to API...")
             job_id = await client.image_to_3d(
-                image_data, enable_pbr, face_count, generate_type, polygon_type
+                image_data, spec.enable_pbr, spec.face_count, spec.generate_type, spec.polygon_type
             )
             
             if not job_id:
@@ -162,12 +268,17 @@ class HunyuanBatchImageTo3DNode:
             
             print(f"✅ Job ID: {job_id}")
             
-            # Wait for completion
-            def progress_callback(percent, message):
-                print(f"\r⏳ {message} ({percent:.1f}%)", end='', flush=True)
+            # Wait for completion - enqueue progress for the shared drain
+            # task when running concurrently, print directly otherwise
+            if progress_q is not None:
+                def progress_callback(percent, message):
+                    progress_q.put_nowait((image_path.name, percent, message))
+            else:
+                def progress_callback(percent, message):
+                    print(f"\r⏳ {message} ({percent:.1f}%)", end='', flush=True)
             
             result = await client.wait_for_task_completion(
-                job_id, max_wait_time, progress_callback=progress_callback
+                job_id, spec.max_wait_time, progress_callback=progress_callback
             )
             print()
             
@@ -184,10 +295,15 @@ class HunyuanBatchImageTo3DNode:
             
             # Download to custom output folder
             output_filename = f"{image_path.stem}_3d.glb"
-            output_path = self._get_output_path(output_folder, output_filename)
-            
+            output_path = self._get_output_path(spec.output_folder, output_filename)
+
             print(f"⬇️  Downloading...")
-            await client.download_model(glb_url, output_path)
+            # Large GLBs fetch faster as parallel ranges; the timeout keeps
+            # one stuck transfer from deadlocking the whole batch
+            await asyncio.wait_for(
+                client.download_model(glb_url, output_path, parts=spec.download_parts),
+                timeout=max(60, spec.max_wait_time // 4)
+            )
             
             print(f"✅ Saved: {output_path}")
             return (output_path, True, "Success")
@@ -197,10 +313,11 @@ class HunyuanBatchImageTo3DNode:
             print(f"❌ Error: {error_msg}")
             return (str(image_path), False, error_msg)
     
-    def batch_generate(self, config: Dict[str, str], input_folder: str, 
-                      output_folder: str, file_pattern: str, enable_pbr: bool, 
-                      face_count: int, generate_type: str, polygon_type: str, 
-                      max_wait_time: int, max_images: int) -> Tuple[str]:
+    def batch_generate(self, config: HunyuanConfig, input_folder: str,
+                      output_folder: str, file_pattern: str, enable_pbr: bool,
+                      face_count: int, generate_type: str, polygon_type: str,
+                      max_wait_time: int, max_images: int, max_concurrency: int = 4,
+                      resize_filter: str = "bicubic", download_parts: int = 4) -> Tuple[str]:
         """Batch process images from folder"""
         
         print("\n" + "="*60)
@@ -220,66 +337,74 @@ class HunyuanBatchImageTo3DNode:
         print(f"⚙️  Settings: {generate_type}, {face_count} faces, PBR: {enable_pbr}")
         print()
         
+        # Bind the invariant per-batch settings once; each job task only
+        # carries its image path plus this shared spec
+        spec = JobSpec(
+            output_folder=output_folder,
+            enable_pbr=enable_pbr,
+            face_count=face_count,
+            generate_type=generate_type,
+            polygon_type=polygon_type,
+            max_wait_time=max_wait_time,
+            resize_filter=resize_filter,
+            download_parts=download_parts,
+        )
+
         # Initialize client
         client = TencentCloudAPIClient(
-            secret_id=config["secret_id"],
-            secret_key=config["secret_key"],
-            region=config["region"]
+            secret_id=config.secret_id,
+            secret_key=config.secret_key,
+            region=config.region
         )
         
-        # Process images
-        results = []
-        successful = 0
-        failed = 0
-        
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import nest_asyncio
-                nest_asyncio.apply()
-                
-            for idx, image_path in enumerate(image_files, 1):
-                print(f"\n[{idx}/{len(image_files)}]")
-                
-                result = loop.run_until_complete(
-                    self._process_single_image(
-                        client, image_path, output_folder, enable_pbr, face_count,
-                        generate_type, polygon_type, max_wait_time
-                    )
-                )
-                
-                results.append(result)
-                if result[1]:  # Success
-                    successful += 1
-                else:
-                    failed += 1
-                    
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            for idx, image_path in enumerate(image_files, 1):
-                print(f"\n[{idx}/{len(image_files)}]")
-                
-                result = loop.run_until_complete(
-                    self._process_single_image(
-                        client, image_path, output_folder, enable_pbr, face_count,
-                        generate_type, polygon_type, max_wait_time
-                    )
+        # Process images concurrently (bounded by max_concurrency) - the
+        # work is dominated by network waits, so parallel submissions turn
+        # N serial round-trips into ceil(N / max_concurrency) batches
+        async def _run_all():
+            sem = asyncio.Semaphore(max_concurrency)
+
+            async def _bounded(coro):
+                async with sem:
+                    return await coro
+
+            # The whole batch runs inside the client's session scope, so
+            # every submit/poll/download reuses the pooled connections and
+            # the session is torn down exactly once at the end
+            async with client:
+                progress_q = asyncio.Queue()
+                drain_task = asyncio.ensure_future(
+                    self._drain_progress(progress_q, len(image_files))
                 )
-                
-                results.append(result)
-                if result[1]:
-                    successful += 1
-                else:
-                    failed += 1
-            
-            loop.close()
+                tasks = [
+                    asyncio.ensure_future(_bounded(self._process_single_image(
+                        client, image_path, spec, progress_q
+                    )))
+                    for image_path in image_files
+                ]
+                gathered = await asyncio.gather(*tasks, return_exceptions=True)
+                progress_q.put_nowait(None)  # Stop the drain task
+                await drain_task
+                return gathered
+
+        # Run on the shared background loop (see nodes._run_coro) instead
+        # of re-entering ComfyUI's loop through nest_asyncio's monkey-patch
+        raw_results = _run_coro(_run_all())
+
+        # gather already returns one preallocated list in task order; fix
+        # up exceptions in place instead of rebuilding with appends
+        results = list(raw_results)
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                results[i] = (str(image_files[i]), False, str(result))
+
+        successful = sum(1 for r in results if r[1])
+        failed = len(results) - successful
         
         # Generate summary
-        import folder_paths
-        output_dir = folder_paths.get_output_directory()
-        full_output_path = os.path.join(output_dir, output_folder)
+        if os.path.isabs(output_folder):
+            full_output_path = output_folder
+        else:
+            full_output_path = os.path.join(self._output_dir or "", output_folder)
         
         summary = f"""
 ╔══════════════════════════════════════════════════════════╗
@@ -294,15 +419,18 @@ class HunyuanBatchImageTo3DNode:
 RESULTS:
 """
         
-        # Collect successful model paths
+        # Collect successful model paths; build the per-file lines in a
+        # list and join once instead of quadratic string concatenation
         model_paths = []
+        lines = []
         for path, success, message in results:
             status = "✅" if success else "❌"
-            filename = Path(path).name
-            summary += f"\n{status} {filename}: {message}"
+            lines.append(f"{status} {Path(path).name}: {message}")
             if success:
                 model_paths.append(path)
-        
+
+        summary += "\n" + "\n".join(lines)
+
         print("\n" + summary)
         
         # Return paths as newline-separated string for compatibility
@@ -4,15 +4,37 @@ Handles model storage, caching, and cleanup
 """
 
 import os
+import asyncio
+import functools
 import hashlib
+import heapq
+import stat
 import time
-import glob
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
 import logging
 
+# aiofiles enables fully async disk writes; fall back to thread offload
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
 logger = logging.getLogger(__name__)
 
+# Precompiled filename-sanitizing patterns (generate_filename is called per job)
+_CLEAN_SPECIAL_RE = re.compile(r'[^\w\s-]')
+_CLEAN_SPACE_RE = re.compile(r'[-\s]+')
+
+
+@functools.lru_cache(maxsize=256)
+def _sanitize_prompt(prompt: str) -> str:
+    """Sanitized filename prefix for a prompt, cached across repeat runs"""
+    clean = _CLEAN_SPECIAL_RE.sub('', prompt.strip())
+    clean = _CLEAN_SPACE_RE.sub('_', clean)
+    return clean[:50]  # Limit length
+
 
 class FileManager:
     """
@@ -61,18 +83,91 @@ class FileManager:
         Returns:
             Unique filename
         """
-        # Clean prompt for filename
-        clean_prompt = re.sub(r'[^\w\s-]', '', prompt.strip())
-        clean_prompt = re.sub(r'[-\s]+', '_', clean_prompt)
-        clean_prompt = clean_prompt[:50]  # Limit length
-        
-        # Create hash for uniqueness
-        prompt_hash = hashlib.md5(prompt.encode()).hexdigest()[:8]
+        # Clean prompt for filename (regex work cached per distinct prompt)
+        clean_prompt = _sanitize_prompt(prompt)
+
+        # Create hash for uniqueness (blake2b is faster than md5 and not
+        # deprecated under FIPS; digest_size=4 keeps the 8-char tag)
+        prompt_hash = hashlib.blake2b(prompt.encode('utf-8'), digest_size=4).hexdigest()
         timestamp = int(time.time())
         
         filename = f"{clean_prompt}_{prompt_hash}_{timestamp}.{extension}"
         return filename
         
+    def _encode_cache_key(self, filepath: str, params: str = "") -> str:
+        """
+        Compute the cache key for an image file
+
+        Keyed by mtime, size and the first 64 KB of content - much cheaper
+        than hashing the whole file, yet safe against stale hits here. The
+        params string mixes the encoding settings into the key so changing
+        them (resize filter, quality, ...) invalidates old entries.
+
+        Args:
+            filepath: Path to the source image
+            params: Encoding settings to bind into the key
+
+        Returns:
+            Hex digest cache key
+        """
+        stat_result = os.stat(filepath)
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(str(stat_result.st_mtime_ns).encode())
+        hasher.update(str(stat_result.st_size).encode())
+        hasher.update(params.encode())
+        with open(filepath, 'rb') as f:
+            hasher.update(f.read(65536))
+        return hasher.hexdigest()
+
+    def get_encoded_cache(self, filepath: str, params: str = "") -> Optional[str]:
+        """
+        Look up a cached base64 encoding for an image file
+
+        Args:
+            filepath: Path to the source image
+            params: Encoding settings the entry must have been made with
+
+        Returns:
+            Cached base64 string, or None on cache miss
+        """
+        try:
+            cache_file = self.get_cache_path(f"{self._encode_cache_key(filepath, params)}.b64")
+            if os.path.isfile(cache_file):
+                with open(cache_file, 'r', encoding='ascii') as f:
+                    return f.read()
+        except Exception as e:
+            logger.error(f"Error reading encode cache for {filepath}: {e}")
+        return None
+
+    def put_encoded_cache(self, filepath: str, encoded: str, params: str = "") -> None:
+        """
+        Store a base64 encoding for an image file in the cache
+
+        Args:
+            filepath: Path to the source image
+            encoded: Base64 string to cache
+            params: Encoding settings the string was produced with
+        """
+        try:
+            cache_file = self.get_cache_path(f"{self._encode_cache_key(filepath, params)}.b64")
+            with open(cache_file, 'w', encoding='ascii') as f:
+                f.write(encoded)
+        except Exception as e:
+            logger.error(f"Error writing encode cache for {filepath}: {e}")
+
+    def get_output_path(self, prompt: str, extension: str = "glb") -> str:
+        """
+        Build the output path for a newly generated model
+
+        Args:
+            prompt: Prompt or label the model was generated from
+            extension: File extension (default: glb)
+
+        Returns:
+            Full path inside the models directory
+        """
+        return self.get_model_path(self.generate_filename(prompt, extension))
+
     def get_model_path(self, filename: str) -> str:
         """
         Get full path for model file
@@ -97,6 +192,33 @@ class FileManager:
         """
         return os.path.join(self.cache_dir, filename)
         
+    async def awrite(self, filepath: str, data: bytes) -> str:
+        """
+        Write bytes to a file without blocking the event loop
+
+        Uses aiofiles when installed, otherwise offloads the blocking
+        write to the default thread pool.
+
+        Args:
+            filepath: Destination path
+            data: Bytes to write
+
+        Returns:
+            Path to the written file
+        """
+        if aiofiles is not None:
+            async with aiofiles.open(filepath, 'wb') as f:
+                await f.write(data)
+        else:
+            await asyncio.to_thread(self._write_bytes_sync, filepath, data)
+        return filepath
+
+    @staticmethod
+    def _write_bytes_sync(filepath: str, data: bytes):
+        """Blocking write helper for the thread-pool fallback"""
+        with open(filepath, 'wb') as f:
+            f.write(data)
+
     def file_exists(self, filepath: str) -> bool:
         """
         Check if file exists
@@ -107,44 +229,70 @@ class FileManager:
         Returns:
             True if file exists, False otherwise
         """
-        return os.path.exists(filepath) and os.path.isfile(filepath)
-        
+        # Single stat instead of exists + isfile (two stats)
+        try:
+            return stat.S_ISREG(os.stat(filepath).st_mode)
+        except OSError:
+            return False
+
     def get_file_size(self, filepath: str) -> int:
         """
         Get file size in bytes
-        
+
         Args:
             filepath: Path to file
-            
+
         Returns:
             File size in bytes, 0 if file doesn't exist
         """
+        # Single stat instead of exists + isfile + getsize (three stats)
         try:
-            if self.file_exists(filepath):
-                return os.path.getsize(filepath)
-        except Exception as e:
-            logger.error(f"Error getting file size for {filepath}: {e}")
+            stat_result = os.stat(filepath)
+            if stat.S_ISREG(stat_result.st_mode):
+                return stat_result.st_size
+        except OSError:
+            pass
         return 0
-        
+
     def delete_file(self, filepath: str) -> bool:
         """
         Delete file safely
-        
+
         Args:
             filepath: Path to file
-            
+
         Returns:
             True if deleted successfully, False otherwise
         """
+        # Let remove report a missing file instead of pre-checking with
+        # extra stats
         try:
-            if self.file_exists(filepath):
-                os.remove(filepath)
-                logger.info(f"Deleted file: {filepath}")
-                return True
+            os.remove(filepath)
+            logger.info(f"Deleted file: {filepath}")
+            return True
+        except FileNotFoundError:
+            return False
         except Exception as e:
             logger.error(f"Error deleting file {filepath}: {e}")
         return False
         
+    def _delete_quiet(self, filepath: str) -> bool:
+        """
+        Delete a known-existing file without the existence pre-check
+
+        Args:
+            filepath: Path to file (existence already confirmed by scandir)
+
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        try:
+            os.remove(filepath)
+            return True
+        except OSError as e:
+            logger.error(f"Error deleting file {filepath}: {e}")
+            return False
+
     def cleanup_old_files(self, directory: str, max_age_hours: int = 24, max_files: int = 100) -> int:
         """
         Clean up old files in directory
@@ -163,34 +311,33 @@ class FileManager:
             if not os.path.exists(directory):
                 return 0
                 
-            # Get all files with modification time
+            # Get all files with modification time - scandir's DirEntry
+            # caches the stat from the directory read, one syscall per
+            # entry instead of separate isfile + getmtime stats
             files = []
-            for filepath in glob.glob(os.path.join(directory, "*")):
-                if os.path.isfile(filepath):
-                    mtime = os.path.getmtime(filepath)
-                    files.append((filepath, mtime))
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        files.append((entry.path, entry.stat(follow_symlinks=False).st_mtime))
                     
-            # Sort by modification time (newest first)
-            files.sort(key=lambda x: x[1], reverse=True)
-            
             current_time = time.time()
             max_age_seconds = max_age_hours * 3600
-            
-            # Delete old files
-            for i, (filepath, mtime) in enumerate(files):
-                should_delete = False
-                
-                # Delete if too old
-                if current_time - mtime > max_age_seconds:
-                    should_delete = True
-                    
-                # Delete if exceeding max files limit
-                if i >= max_files:
-                    should_delete = True
-                    
-                if should_delete:
-                    if self.delete_file(filepath):
-                        deleted_count += 1
+
+            # Keep only the newest max_files - nlargest is O(N log K)
+            # versus O(N log N) for sorting the whole listing
+            keep = {path for path, _ in heapq.nlargest(max_files, files, key=lambda x: x[1])}
+
+            # Collect everything too old or beyond the max files limit, then
+            # delete in parallel - each remove is an independent syscall
+            # whose latency dominates on slow or networked filesystems
+            paths_to_delete = [
+                filepath for filepath, mtime in files
+                if current_time - mtime > max_age_seconds or filepath not in keep
+            ]
+
+            if paths_to_delete:
+                with ThreadPoolExecutor(max_workers=16) as executor:
+                    deleted_count = sum(executor.map(self._delete_quiet, paths_to_delete))
                         
             if deleted_count > 0:
                 logger.info(f"Cleaned up {deleted_count} old files from {directory}")
@@ -243,18 +390,20 @@ class FileManager:
         }
         
         try:
-            # Calculate models directory usage
-            for filepath in glob.glob(os.path.join(self.models_dir, "*")):
-                if os.path.isfile(filepath):
-                    usage["models_size"] += self.get_file_size(filepath)
-                    usage["models_count"] += 1
-                    
-            # Calculate cache directory usage
-            for filepath in glob.glob(os.path.join(self.cache_dir, "*")):
-                if os.path.isfile(filepath):
-                    usage["cache_size"] += self.get_file_size(filepath)
-                    usage["cache_count"] += 1
-                    
+            # Single scandir pass per directory; DirEntry.stat() reuses the
+            # cached result so each file costs one syscall, not four
+            with os.scandir(self.models_dir) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        usage["models_size"] += entry.stat(follow_symlinks=False).st_size
+                        usage["models_count"] += 1
+
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        usage["cache_size"] += entry.stat(follow_symlinks=False).st_size
+                        usage["cache_count"] += 1
+
         except Exception as e:
             logger.error(f"Error calculating disk usage: {e}")
             
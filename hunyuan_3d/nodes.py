@@ -4,10 +4,13 @@ ComfyUI Custom Nodes for Hunyuan 3D v3
 
 import os
 import asyncio
+import atexit
 import base64
 import io
 import json
+import threading
 import time
+from dataclasses import dataclass
 from typing import Dict, Any, Tuple, Optional
 import numpy as np
 from PIL import Image
@@ -18,6 +21,150 @@ from .file_manager import FileManager
 
 logger = logging.getLogger(__name__)
 
+# One FileManager for the whole process: ComfyUI may re-instantiate nodes
+# per execution, and each FileManager construction re-runs the
+# ensure-directories syscalls
+_FM = FileManager()
+
+# Prefer libjpeg-turbo based encoders when installed - SIMD DCT and color
+# conversion make them several times faster than PIL's libjpeg path
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _TURBO_JPEG = TurboJPEG()
+except Exception:
+    _TURBO_JPEG = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# Per-thread scratch space for the PIL encode path (the turbo/cv2 paths
+# return their own bytes). Reusing one grown BytesIO avoids a fresh
+# multi-MB allocation per encode in image-heavy workflows
+_TLS = threading.local()
+
+
+def _encode_jpeg(image: Image.Image, quality: int = 85) -> bytes:
+    """
+    Encode an RGB PIL image to JPEG with the fastest available encoder
+
+    Args:
+        image: RGB PIL image
+        quality: JPEG quality (0-100)
+
+    Returns:
+        JPEG-encoded bytes
+    """
+    if _TURBO_JPEG is not None:
+        return _TURBO_JPEG.encode(np.asarray(image), quality=quality, pixel_format=TJPF_RGB)
+
+    if cv2 is not None:
+        # cv2 expects BGR channel order
+        ok, buf = cv2.imencode('.jpg', np.ascontiguousarray(np.asarray(image)[:, :, ::-1]),
+                               [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        if ok:
+            return buf.tobytes()
+
+    buffer = getattr(_TLS, 'jpeg_buf', None)
+    if buffer is None:
+        buffer = _TLS.jpeg_buf = io.BytesIO()
+    buffer.seek(0)
+    buffer.truncate(0)
+    image.save(buffer, format="JPEG", quality=quality)
+    return bytes(buffer.getbuffer())
+
+
+@dataclass(frozen=True, slots=True)
+class HunyuanConfig:
+    """API credentials passed between nodes
+
+    Frozen and slotted: hashable (so it can key the client cache) and a
+    fraction of a dict's footprint, with C-level attribute access.
+    __getitem__ keeps older dict-style consumers working.
+    """
+    secret_id: str
+    secret_key: str
+    region: str
+
+    def __getitem__(self, key: str) -> str:
+        return getattr(self, key)
+
+
+# One client per credential set, shared across nodes and runs. The client
+# holds a pooled aiohttp session, so reuse skips the TCP+TLS handshake on
+# every submit/poll/download instead of paying it once per node execution.
+# Keyed on the full (hashable) config so editing any field - including a
+# mistyped secret key - yields a fresh client instead of a stale one
+_CLIENT_CACHE: Dict[HunyuanConfig, TencentCloudAPIClient] = {}
+
+
+def _get_or_create_client(config: HunyuanConfig) -> TencentCloudAPIClient:
+    """
+    Return the cached API client for these credentials, creating it lazily
+
+    Args:
+        config: API configuration with secret_id, secret_key and region
+
+    Returns:
+        Shared TencentCloudAPIClient instance
+    """
+    client = _CLIENT_CACHE.get(config)
+    if client is None:
+        client = TencentCloudAPIClient(
+            secret_id=config.secret_id,
+            secret_key=config.secret_key,
+            region=config.region
+        )
+        _CLIENT_CACHE[config] = client
+    return client
+
+
+# Persistent background event loop for node coroutines. ComfyUI may call
+# nodes from inside its own running loop; blocking that loop would hang
+# the server and a throwaway per-call loop would tear down the cached
+# client's connection pool on close. One daemon-thread loop avoids both
+_BG_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_BG_LOOP_LOCK = threading.Lock()
+
+
+def _get_bg_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting its thread on first use"""
+    global _BG_LOOP
+    with _BG_LOOP_LOCK:
+        if _BG_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="hunyuan3d-loop",
+                             daemon=True).start()
+            _BG_LOOP = loop
+    return _BG_LOOP
+
+
+def _run_coro(coro):
+    """
+    Run a coroutine to completion from synchronous node code
+
+    Args:
+        coro: Coroutine to execute
+
+    Returns:
+        The coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_bg_loop()).result()
+
+
+@atexit.register
+def _close_cached_clients():
+    """Close pooled HTTP sessions on interpreter shutdown"""
+    for client in _CLIENT_CACHE.values():
+        try:
+            if _BG_LOOP is not None:
+                asyncio.run_coroutine_threadsafe(client.close(), _BG_LOOP).result(timeout=5)
+            else:
+                asyncio.run(client.close())
+        except Exception:
+            pass
+
 
 class HunyuanConfigNode:
     """
@@ -53,17 +200,102 @@ class HunyuanConfigNode:
             raise ValueError("Secret ID cannot be empty")
         if not secret_key.strip():
             raise ValueError("Secret Key cannot be empty")
-            
-        config = {
-            "secret_id": secret_id.strip(),
-            "secret_key": secret_key.strip(),
-            "region": region
-        }
-        
+
+        config = HunyuanConfig(
+            secret_id=secret_id.strip(),
+            secret_key=secret_key.strip(),
+            region=region
+        )
+
         return (config,)
 
 
-class HunyuanTextTo3DNode:
+class _HunyuanBaseNode:
+    """
+    Shared submit/poll/download plumbing for the generation nodes
+
+    Text and Image generation only differ in how the job is submitted;
+    everything after the JobId - progress tracking, result-URL extraction
+    and the GLB download - lives here once.
+    """
+
+    def __init__(self):
+        self.file_manager = _FM
+
+    async def _run_task(self, client: TencentCloudAPIClient, submit_call,
+                        label: str, out_name: str, max_wait_time: int) -> Dict:
+        """
+        Submit a job, wait for completion and download the resulting GLB
+
+        Args:
+            client: Shared API client
+            submit_call: Zero-argument coroutine factory performing the submit
+            label: Progress-line label (e.g. "Text-to-3D")
+            out_name: Name passed to FileManager.get_output_path
+            max_wait_time: Maximum wait time in seconds
+
+        Returns:
+            ComfyUI result dict with the model path
+        """
+        try:
+            job_id = await submit_call()
+
+            if not job_id:
+                raise Exception("Failed to get JobId from API response")
+
+            logger.info(f"Task submitted with ID: {job_id}")
+            print(f"🚀 Job ID: {job_id}")
+
+            # Wait for completion with progress tracking. Progress prints
+            # flush synchronously through ComfyUI's stdout wrapper, so cap
+            # redraws at ~10/s while always emitting the final 100%
+            last_emit = [0.0]
+
+            def update_progress(percent, message):
+                now = time.monotonic()
+                if percent >= 100 or now - last_emit[0] >= 0.1:
+                    print(f"\r[{label}] {message} ({percent:.1f}%)", end='', flush=True)
+                    last_emit[0] = now
+
+            final_result = await client.wait_for_task_completion(
+                job_id,
+                max_wait_time,
+                progress_callback=update_progress
+            )
+            print()  # New line after progress
+
+            # Get download URLs from result
+            result_files = final_result.get("result_urls", [])
+            if not result_files:
+                raise Exception("No result files in task result")
+
+            # Get GLB file URL
+            download_url = None
+            for file_info in result_files:
+                if file_info.get("type") == "GLB":
+                    download_url = file_info.get("url")
+                    break
+
+            if not download_url:
+                raise Exception("No GLB file found in results")
+
+            # Save to output folder
+            model_path = await client.download_model(
+                download_url,
+                self.file_manager.get_output_path(out_name)
+            )
+
+            print(f"✅ Model saved: {model_path}")
+
+            # Return with UI display info
+            return {"ui": {"text": [model_path]}, "result": (model_path,)}
+
+        except Exception as e:
+            logger.error(f"Async generation failed: {e}")
+            raise
+
+
+class HunyuanTextTo3DNode(_HunyuanBaseNode):
     """
     Text to 3D generation node using Hunyuan 3D API
     """
@@ -110,11 +342,8 @@ class HunyuanTextTo3DNode:
     OUTPUT_NODE = True
     CATEGORY = "Hunyuan3D/v3"
     OUTPUT_IS_LIST = (False,)
-    
-    def __init__(self):
-        self.file_manager = FileManager()
-    
-    def generate_3d(self, config: Dict[str, str], prompt: str, enable_pbr: bool, 
+
+    def generate_3d(self, config: HunyuanConfig, prompt: str, enable_pbr: bool,
                    face_count: int, generate_type: str, polygon_type: str, max_wait_time: int) -> Tuple[str]:
         """
         Generate 3D model from text prompt
@@ -134,42 +363,17 @@ class HunyuanTextTo3DNode:
             # Validate inputs
             if not prompt.strip():
                 raise ValueError("Prompt cannot be empty")
-            
-            # Initialize API client
-            client = TencentCloudAPIClient(
-                secret_id=config["secret_id"],
-                secret_key=config["secret_key"],
-                region=config["region"]
+
+            # Reuse the pooled API client for these credentials
+            client = _get_or_create_client(config)
+
+            # Run on the shared background loop so the client's pooled
+            # connections survive between node executions
+            return _run_coro(
+                self._async_generate(client, prompt, enable_pbr, face_count,
+                                     generate_type, polygon_type, max_wait_time)
             )
-            
-            # Run async generation
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    import nest_asyncio
-                    nest_asyncio.apply()
-                    result = loop.run_until_complete(
-                        self._async_generate(client, prompt, enable_pbr, face_count, 
-                                           generate_type, polygon_type, max_wait_time)
-                    )
-                else:
-                    result = loop.run_until_complete(
-                        self._async_generate(client, prompt, enable_pbr, face_count,
-                                           generate_type, polygon_type, max_wait_time)
-                    )
-                return result
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    result = loop.run_until_complete(
-                        self._async_generate(client, prompt, enable_pbr, face_count,
-                                           generate_type, polygon_type, max_wait_time)
-                    )
-                    return result
-                finally:
-                    loop.close()
-                
+
         except Exception as e:
             logger.error(f"Text-to-3D generation failed: {e}")
             error_msg = f"Error: {str(e)}"
@@ -180,60 +384,18 @@ class HunyuanTextTo3DNode:
                              enable_pbr: bool, face_count: int, generate_type: str,
                              polygon_type: str, max_wait_time: int) -> Tuple[str]:
         """Async 3D model generation from text"""
-        try:
-            # Submit task
-            logger.info(f"Submitting text-to-3D task: {prompt}")
-            job_id = await client.text_to_3d(prompt, enable_pbr, face_count, generate_type, polygon_type)
-            
-            if not job_id:
-                raise Exception("Failed to get JobId from API response")
-            
-            logger.info(f"Task submitted with ID: {job_id}")
-            print(f"🚀 Job ID: {job_id}")
-            
-            # Wait for completion with progress tracking
-            def update_progress(percent, message):
-                print(f"\r[Text-to-3D] {message} ({percent:.1f}%)", end='', flush=True)
-            
-            final_result = await client.wait_for_task_completion(
-                job_id, 
-                max_wait_time,
-                progress_callback=update_progress
-            )
-            print()  # New line after progress
-            
-            # Get download URLs from result
-            result_files = final_result.get("result_urls", [])
-            if not result_files:
-                raise Exception("No result files in task result")
-            
-            # Get GLB file URL
-            download_url = None
-            for file_info in result_files:
-                if file_info.get("type") == "GLB":
-                    download_url = file_info.get("url")
-                    break
-            
-            if not download_url:
-                raise Exception("No GLB file found in results")
-            
-            # Save to output folder
-            model_path = await client.download_model(
-                download_url,
-                self.file_manager.get_output_path(prompt)
-            )
-            
-            print(f"✅ Model saved: {model_path}")
-            
-            # Return with UI display info
-            return {"ui": {"text": [model_path]}, "result": (model_path,)}
-            
-        except Exception as e:
-            logger.error(f"Async generation failed: {e}")
-            raise
+        logger.info(f"Submitting text-to-3D task: {prompt}")
+        return await self._run_task(
+            client,
+            lambda: client.text_to_3d(prompt, enable_pbr, face_count,
+                                      generate_type, polygon_type),
+            label="Text-to-3D",
+            out_name=prompt,
+            max_wait_time=max_wait_time
+        )
 
 
-class HunyuanImageTo3DNode:
+class HunyuanImageTo3DNode(_HunyuanBaseNode):
     """
     Image to 3D generation node using Hunyuan 3D API
     """
@@ -276,25 +438,31 @@ class HunyuanImageTo3DNode:
     OUTPUT_NODE = True
     CATEGORY = "Hunyuan3D/v3"
     OUTPUT_IS_LIST = (False,)
-    
-    def __init__(self):
-        self.file_manager = FileManager()
-    
+
     def _tensor_to_base64(self, tensor) -> str:
         """Convert ComfyUI image tensor to base64"""
         # ComfyUI image format: [batch, height, width, channels] with values [0, 1]
-        # Convert torch.Tensor to numpy if needed
         if hasattr(tensor, 'cpu'):
-            tensor = tensor.cpu().numpy()
-        
-        if len(tensor.shape) == 4:
-            tensor = tensor[0]
-        
-        # Convert to PIL Image
-        image_np = (tensor * 255).astype(np.uint8)
+            # Scale and cast on the tensor before moving to numpy: the
+            # uint8 result is 4x smaller than float32, so the device copy
+            # and the PIL construction move a quarter of the bytes
+            t = tensor[0] if tensor.dim() == 4 else tensor
+            image_np = np.ascontiguousarray(t.mul(255).clamp_(0, 255).byte().cpu().numpy())
+        else:
+            if len(tensor.shape) == 4:
+                tensor = tensor[0]
+            image_np = (tensor * 255).astype(np.uint8)
+
+        # Flatten alpha over white in one vectorized pass instead of the
+        # Image.new + split + paste trio, which walks the image three times
+        if image_np.ndim == 3 and image_np.shape[-1] == 4:
+            rgb = image_np[..., :3].astype(np.uint16)
+            alpha = image_np[..., 3:].astype(np.uint16)
+            image_np = ((rgb * alpha + 255 * (255 - alpha)) >> 8).astype(np.uint8)
+
         image = Image.fromarray(image_np)
-        
-        # Convert to RGB if needed
+
+        # Convert to RGB if needed (PIL fallback for non-RGBA sources)
         if image.mode in ('RGBA', 'LA', 'P'):
             background = Image.new('RGB', image.size, (255, 255, 255))
             if image.mode == 'P':
@@ -304,26 +472,41 @@ class HunyuanImageTo3DNode:
         elif image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Resize to reasonable size
+        # Resize to reasonable size. For mild downscales BILINEAR (4-tap)
+        # is visually equivalent to LANCZOS (~36-tap) at a fraction of the
+        # cost; LANCZOS only pays off on heavy reductions. thumbnail()
+        # resizes in place without allocating via an intermediate resize()
         max_size = 1024
         if max(image.size) > max_size:
             ratio = max_size / max(image.size)
-            new_size = tuple(int(dim * ratio) for dim in image.size)
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
-        
-        # Convert to base64 with JPEG compression
-        buffer = io.BytesIO()
-        image.save(buffer, format="JPEG", quality=85, optimize=True)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            resample = Image.Resampling.BILINEAR if ratio > 0.5 else Image.Resampling.LANCZOS
+            image.thumbnail((max_size, max_size), resample=resample)
         
-        # Check size
-        size_mb = len(image_base64) / (1024 * 1024)
+        # Convert to base64 with JPEG compression. optimize=True is
+        # deliberately dropped - the extra Huffman-table pass is a second
+        # full encode for a few percent of size on an already-small upload.
+        # Oversized results retry at lower quality plus a mild downscale
+        # instead of shipping a payload the API will reject: 3 MB of JPEG
+        # leaves headroom for base64's 33% inflation under the 4 MB limit
+        max_jpeg_bytes = 3 * 1024 * 1024
+        for quality in (85, 75, 65):
+            jpeg_bytes = _encode_jpeg(image, quality=quality)
+            if len(jpeg_bytes) <= max_jpeg_bytes:
+                break
+            image.thumbnail((int(image.size[0] * 0.8), int(image.size[1] * 0.8)),
+                            Image.Resampling.BILINEAR)
+
+        # Size-check the base64 bytes directly and decode to str only at
+        # the last moment; ascii is enough (and cheaper than utf-8) since
+        # base64 output is pure ASCII
+        b64 = base64.b64encode(jpeg_bytes)
+        size_mb = len(b64) / (1024 * 1024)
         if size_mb > 4:
             print(f"⚠️  Warning: Base64 size {size_mb:.2f}MB - may exceed API limit")
-        
-        return image_base64
+
+        return b64.decode('ascii')
     
-    def generate_3d(self, config: Dict[str, str], image, enable_pbr: bool,
+    def generate_3d(self, config: HunyuanConfig, image, enable_pbr: bool,
                    face_count: int, generate_type: str, polygon_type: str, max_wait_time: int) -> Tuple[str]:
         """
         Generate 3D model from image
@@ -341,42 +524,17 @@ class HunyuanImageTo3DNode:
         try:
             # Convert image tensor to base64
             image_data = self._tensor_to_base64(image)
-            
-            # Initialize API client
-            client = TencentCloudAPIClient(
-                secret_id=config["secret_id"],
-                secret_key=config["secret_key"],
-                region=config["region"]
+
+            # Reuse the pooled API client for these credentials
+            client = _get_or_create_client(config)
+
+            # Run on the shared background loop so the client's pooled
+            # connections survive between node executions
+            return _run_coro(
+                self._async_generate(client, image_data, enable_pbr, face_count,
+                                     generate_type, polygon_type, max_wait_time)
             )
-            
-            # Run async generation
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    import nest_asyncio
-                    nest_asyncio.apply()
-                    result = loop.run_until_complete(
-                        self._async_generate(client, image_data, enable_pbr, face_count,
-                                           generate_type, polygon_type, max_wait_time)
-                    )
-                else:
-                    result = loop.run_until_complete(
-                        self._async_generate(client, image_data, enable_pbr, face_count,
-                                           generate_type, polygon_type, max_wait_time)
-                    )
-                return result
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    result = loop.run_until_complete(
-                        self._async_generate(client, image_data, enable_pbr, face_count,
-                                           generate_type, polygon_type, max_wait_time)
-                    )
-                    return result
-                finally:
-                    loop.close()
-                
+
         except Exception as e:
             logger.error(f"Image-to-3D generation failed: {e}")
             error_msg = f"Error: {str(e)}"
@@ -387,54 +545,12 @@ class HunyuanImageTo3DNode:
                              enable_pbr: bool, face_count: int, generate_type: str,
                              polygon_type: str, max_wait_time: int) -> Tuple[str]:
         """Async 3D model generation from image"""
-        try:
-            # Submit task
-            logger.info("Submitting image-to-3D task")
-            job_id = await client.image_to_3d(image_data, enable_pbr, face_count, generate_type, polygon_type)
-            
-            if not job_id:
-                raise Exception("Failed to get JobId from API response")
-            
-            logger.info(f"Task submitted with ID: {job_id}")
-            print(f"🚀 Job ID: {job_id}")
-            
-            # Wait for completion with progress tracking
-            def update_progress(percent, message):
-                print(f"\r[Image-to-3D] {message} ({percent:.1f}%)", end='', flush=True)
-            
-            final_result = await client.wait_for_task_completion(
-                job_id,
-                max_wait_time,
-                progress_callback=update_progress
-            )
-            print()  # New line after progress
-            
-            # Get download URLs from result
-            result_files = final_result.get("result_urls", [])
-            if not result_files:
-                raise Exception("No result files in task result")
-            
-            # Get GLB file URL
-            download_url = None
-            for file_info in result_files:
-                if file_info.get("type") == "GLB":
-                    download_url = file_info.get("url")
-                    break
-            
-            if not download_url:
-                raise Exception("No GLB file found in results")
-            
-            # Save to output folder
-            model_path = await client.download_model(
-                download_url,
-                self.file_manager.get_output_path("image_to_3d")
-            )
-            
-            print(f"✅ Model saved: {model_path}")
-            
-            # Return with UI display info
-            return {"ui": {"text": [model_path]}, "result": (model_path,)}
-            
-        except Exception as e:
-            logger.error(f"Async generation failed: {e}")
-            raise
+        logger.info("Submitting image-to-3D task")
+        return await self._run_task(
+            client,
+            lambda: client.image_to_3d(image_data, enable_pbr, face_count,
+                                       generate_type, polygon_type),
+            label="Image-to-3D",
+            out_name="image_to_3d",
+            max_wait_time=max_wait_time
+        )
@@ -4,6 +4,44 @@ Preview nodes for 3D models
 import os
 from typing import Dict, Tuple
 
+# Banner templates built once at import; the nodes run on the UI hot path
+# (batch scrubbing re-executes per index change) and a single format_map
+# substitution beats re-evaluating a 20-line f-string literal every call
+_PREVIEW_TEMPLATE = """
+╔══════════════════════════════════════════════════════════╗
+║                  3D MODEL PREVIEW                        ║
+╚══════════════════════════════════════════════════════════╝
+
+📁 File: {basename}
+📂 Path: {path}
+📊 Size: {size_mb:.2f} MB
+
+💡 To view this model:
+   • Use a GLB viewer extension in ComfyUI
+   • Open with Blender
+   • Use online viewer: https://gltf-viewer.donmccurdy.com/
+"""
+
+_BATCH_TEMPLATE = """
+╔══════════════════════════════════════════════════════════╗
+║              BATCH MODEL PREVIEW ({current}/{total})              ║
+╚══════════════════════════════════════════════════════════╝
+
+📁 File: {basename}
+📂 Path: {path}
+📊 Size: {size_mb:.2f} MB
+
+🔢 Model Index: {index} of {last_index}
+📋 Total Models: {total}
+
+💡 Navigation:
+   • Change 'model_index' parameter to view different models
+   • Index 0 = first model, {last_index} = last model
+
+🌐 View Online:
+   • https://gltf-viewer.donmccurdy.com/
+"""
+
 
 class Hunyuan3DPreviewNode:
     """
@@ -26,32 +64,25 @@ class Hunyuan3DPreviewNode:
     
     def preview_model(self, model_path: str) -> Dict:
         """Preview 3D model"""
-        
-        if not model_path or not os.path.exists(model_path):
+
+        # One stat covers both the existence check and the size lookup
+        try:
+            file_size = os.stat(model_path).st_size if model_path else None
+        except OSError:
+            file_size = None
+
+        if file_size is None:
             return {
-                "ui": {"text": [f"❌ Model file not found: {model_path}"]}, 
+                "ui": {"text": [f"❌ Model file not found: {model_path}"]},
                 "result": (model_path,)
             }
-        
-        # Get file info
-        file_size = os.path.getsize(model_path)
-        file_size_mb = file_size / (1024 * 1024)
-        
-        preview_text = f"""
-╔══════════════════════════════════════════════════════════╗
-║                  3D MODEL PREVIEW                        ║
-╚══════════════════════════════════════════════════════════╝
 
-📁 File: {os.path.basename(model_path)}
-📂 Path: {model_path}
-📊 Size: {file_size_mb:.2f} MB
+        preview_text = _PREVIEW_TEMPLATE.format_map({
+            "basename": os.path.basename(model_path),
+            "path": model_path,
+            "size_mb": file_size / (1024 * 1024)
+        })
 
-💡 To view this model:
-   • Use a GLB viewer extension in ComfyUI
-   • Open with Blender
-   • Use online viewer: https://gltf-viewer.donmccurdy.com/
-"""
-        
         return {
             "ui": {
                 "text": [preview_text],
@@ -81,19 +112,32 @@ class HunyuanBatchPreviewNode:
     FUNCTION = "preview_batch_model"
     OUTPUT_NODE = True
     CATEGORY = "Hunyuan3D/v3"
-    
+
+    def __init__(self):
+        # Scrubbing model_index re-runs this node with the same
+        # model_paths string; a single-slot (input, parsed) pair is enough
+        # since only one batch is ever scrubbed at a time, and comparing
+        # the string itself cannot collide the way a bare hash can
+        self._last_input: str = ""
+        self._last_paths: list = []
+
     def preview_batch_model(self, model_paths: str, model_index: int) -> Dict:
         """Preview a specific model from batch results"""
-        
+
         if not model_paths:
             return {
-                "ui": {"text": ["❌ No model paths provided"]}, 
+                "ui": {"text": ["❌ No model paths provided"]},
                 "result": ("",)
             }
-        
-        # Split paths (newline-separated)
-        paths = [p.strip() for p in model_paths.split('\n') if p.strip()]
-        
+
+        # Split paths (newline-separated) once per distinct input
+        if model_paths == self._last_input:
+            paths = self._last_paths
+        else:
+            paths = [p.strip() for p in model_paths.split('\n') if p.strip()]
+            self._last_input = model_paths
+            self._last_paths = paths
+
         if not paths:
             return {
                 "ui": {"text": ["❌ No valid model paths found"]}, 
@@ -104,37 +148,25 @@ class HunyuanBatchPreviewNode:
         model_index = max(0, min(model_index, len(paths) - 1))
         selected_path = paths[model_index]
         
-        # Check if file exists
-        if not os.path.exists(selected_path):
+        # One stat covers both the existence check and the size lookup
+        try:
+            file_size = os.stat(selected_path).st_size
+        except OSError:
             return {
-                "ui": {"text": [f"❌ Model file not found: {selected_path}"]}, 
+                "ui": {"text": [f"❌ Model file not found: {selected_path}"]},
                 "result": (selected_path,)
             }
-        
-        # Get file info
-        file_size = os.path.getsize(selected_path)
-        file_size_mb = file_size / (1024 * 1024)
-        
-        preview_text = f"""
-╔══════════════════════════════════════════════════════════╗
-║              BATCH MODEL PREVIEW ({model_index + 1}/{len(paths)})              ║
-╚══════════════════════════════════════════════════════════╝
-
-📁 File: {os.path.basename(selected_path)}
-📂 Path: {selected_path}
-📊 Size: {file_size_mb:.2f} MB
 
-🔢 Model Index: {model_index} of {len(paths) - 1}
-📋 Total Models: {len(paths)}
+        preview_text = _BATCH_TEMPLATE.format_map({
+            "current": model_index + 1,
+            "total": len(paths),
+            "basename": os.path.basename(selected_path),
+            "path": selected_path,
+            "size_mb": file_size / (1024 * 1024),
+            "index": model_index,
+            "last_index": len(paths) - 1
+        })
 
-💡 Navigation:
-   • Change 'model_index' parameter to view different models
-   • Index 0 = first model, {len(paths) - 1} = last model
-
-🌐 View Online:
-   • https://gltf-viewer.donmccurdy.com/
-"""
-        
         return {
             "ui": {
                 "text": [preview_text],